@@ -1,9 +1,14 @@
 import csv
-import doctest
+import re
+import sys
+from array import array
+from collections.abc import Mapping
+from itertools import chain
+from operator import itemgetter
+from types import MappingProxyType
 from abc import ABC, abstractmethod
 
 class GraphError(Exception):
-
     def __init__(self, message=''):
         self.message = message
         super().__init__(self.message)
@@ -15,16 +20,80 @@ class GraphError(Exception):
         return f"GraphError({repr(str(self))})"
 
 
+def _intern(node_id):
+    # repeated string ids (e.g. from CSV rows) share one object
+    return sys.intern(node_id) if type(node_id) is str else node_id
+
+
+def _first_duplicate(keys, existing):
+    seen = set()
+    for key in keys:
+        if key in existing or key in seen:
+            return key
+        seen.add(key)
+
+
+def _batch_attributes(attributes, count, kind):
+    if attributes is None:
+        return [{} for _ in range(count)]
+    # copied like **prop in add_node/add_edge, so the graph never shares a caller's dict
+    rows = []
+    for row in attributes:
+        if not isinstance(row, Mapping) or not all(isinstance(name, str) for name in row):
+            raise GraphError(f"Expected a dict with str keys for each {kind}")
+        rows.append(dict(row))
+    if len(rows) != count:
+        raise GraphError(f"Expected one attribute dict per {kind}")
+    return rows
+
+
+class _PackedAdjacency:
+    # per-node neighbour arrays packed into one CSR buffer; rows are memoryviews
+    __slots__ = ('_indptr', '_indices')
+
+    def __init__(self, adjacency):
+        self._indptr = array('i', [0])
+        self._indices = array('i')
+        for neighbors in adjacency:
+            self._indices.extend(neighbors)
+            self._indptr.append(len(self._indices))
+
+    def __len__(self):
+        return len(self._indptr) - 1
+
+    def __getitem__(self, idx):
+        # views are made per call, not stored, so frozen graphs stay picklable
+        return memoryview(self._indices)[self._indptr[idx]:self._indptr[idx + 1]]
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def unpack(self):
+        return [array('i', neighbors) for neighbors in self]
+
+
 class Node:
+    __slots__ = ('_id', '_attributes')
 
     def __init__(self, identifier, **attributes):
         self._id = identifier
         self._attributes = attributes
 
+    @classmethod
+    def _view(cls, identifier, attributes):
+        # wraps graph-owned storage without copying the attribute dict
+        node = cls.__new__(cls)
+        node._id = identifier
+        node._attributes = attributes
+        return node
+
     def identifier(self):
         return self._id
 
     def attributes(self):
+        return MappingProxyType(self._attributes)
+
+    def attributes_copy(self):
         return self._attributes.copy()
 
     def __str__(self):
@@ -36,157 +105,300 @@ class Node:
 
 
 class Edge:
+    __slots__ = ('_node1', '_node2', '_src_id', '_dst_id', '_attributes')
 
     def __init__(self, node1, node2, **attributes):
         self._node1 = node1
         self._node2 = node2
+        self._src_id = node1.identifier()
+        self._dst_id = node2.identifier()
         self._attributes = attributes
 
+    @classmethod
+    def _view(cls, node1, node2, attributes):
+        edge = cls.__new__(cls)
+        edge._node1 = node1
+        edge._node2 = node2
+        edge._src_id = node1._id
+        edge._dst_id = node2._id
+        edge._attributes = attributes
+        return edge
+
     def attributes(self):
+        return MappingProxyType(self._attributes)
+
+    def attributes_copy(self):
         return self._attributes.copy()
 
     def nodes(self):
         return (self._node1, self._node2)
 
     def __str__(self):
-        final = [f"Edge from node [{self._node1.identifier()}] to node [{self._node2.identifier()}]\n"]
+        final = [f"Edge from node [{self._src_id}] to node [{self._dst_id}]\n"]
         for x, y in sorted(self._attributes.items()):
             final.append(f"    {x} : {y}\n")
         return "".join(final)
 
 
 class BaseGraph(ABC):
+    _undirected = False  # if set, each stored edge also stands for its reverse
 
     def __init__(self):
-        self._nodes = {}  # node id -> node obj
-        self._edges = []  # list of edge objects
-        self._adjacency = {}  # node id -> list of adjacent node ids
+        self._node_ids = []  # node index -> node id
+        self._node_attrs = []  # node index -> attribute dict
+        self._id_to_idx = {}  # node id -> node index
+        self._node_order = None  # node indices sorted by id, None when stale
+        self._edge_src = array('i')  # edge index -> source node index
+        self._edge_dst = array('i')  # edge index -> target node index
+        self._edge_attrs = []  # edge index -> attribute dict
+        self._adjacency = []  # node index -> array of adjacent node indices
+        self._in_adjacency = []  # node index -> array of node indices linking to it
+        self._edge_by_pair = {}  # (node1 id, node2 id) -> edge index
+        self._edge_order = None  # edge indices sorted by pair, None when stale
+        self._csr_cache = {}  # 'out' / 'in' -> CSR tuple, emptied on any change
 
     def __len__(self):
-        return len(self._nodes)
+        return len(self._node_ids)
 
     def add_node(self, node_id, **prop):
-        if node_id in self._nodes:
+        node_id = _intern(node_id)
+        idx = len(self._node_ids)
+        # insert-or-get: one probe both checks for and registers the id
+        if self._id_to_idx.setdefault(node_id, idx) != idx:
+            raise GraphError(f"Node {node_id} already exists")
+        self._node_ids.append(node_id)
+        self._node_attrs.append(prop)
+        self._node_order = None
+        self._csr_cache.clear()
+        self._thaw()
+        self._adjacency.append(array('i'))
+        self._in_adjacency.append(array('i'))
+
+    def add_nodes_batch(self, node_ids, attributes=None):
+        node_ids = list(map(_intern, node_ids))
+        attributes = _batch_attributes(attributes, len(node_ids), 'node')
+        new_ids = set(node_ids)
+        if len(new_ids) < len(node_ids) or not new_ids.isdisjoint(self._id_to_idx):
+            node_id = _first_duplicate(node_ids, self._id_to_idx)
             raise GraphError(f"Node {node_id} already exists")
-        self._nodes[node_id] = Node(node_id, **prop)
-        self._adjacency[node_id] = []
+
+        start = len(self._node_ids)
+        self._id_to_idx.update(zip(node_ids, range(start, start + len(node_ids))))
+        self._node_ids.extend(node_ids)
+        self._node_attrs.extend(attributes)
+        self._node_order = None
+        self._csr_cache.clear()
+        self._thaw()
+        self._adjacency.extend(array('i') for _ in node_ids)
+        self._in_adjacency.extend(array('i') for _ in node_ids)
+
+    def _node_view(self, idx):
+        return Node._view(self._node_ids[idx], self._node_attrs[idx])
 
     def node(self, node_id):
-        if node_id not in self._nodes:
+        if node_id not in self._id_to_idx:
             raise GraphError(f"Node {node_id} not found")
-        return self._nodes[node_id]
+        return self._node_view(self._id_to_idx[node_id])
+
+    def freeze(self):
+        # pack adjacency into flat arrays; the next insertion unpacks it again
+        if not isinstance(self._adjacency, _PackedAdjacency):
+            self._adjacency = _PackedAdjacency(self._adjacency)
+            self._in_adjacency = _PackedAdjacency(self._in_adjacency)
+
+    def _thaw(self):
+        if isinstance(self._adjacency, _PackedAdjacency):
+            self._adjacency = self._adjacency.unpack()
+            self._in_adjacency = self._in_adjacency.unpack()
+
+    def _sorted_node_indices(self):
+        if self._node_order is None:
+            self._node_order = sorted(range(len(self._node_ids)),
+                                      key=self._node_ids.__getitem__)
+        return self._node_order
 
     def nodes(self):
-        return [self._nodes[node_id] for node_id in sorted(self._nodes)]
+        return [self._node_view(idx) for idx in self._sorted_node_indices()]
+
+    def _check_new_edges(self, pairs, keys):
+        missing = set(chain.from_iterable(pairs)).difference(self._id_to_idx)
+        if missing:
+            raise GraphError(f"Node {missing.pop()} not found")
+        new_keys = set(keys)
+        if len(new_keys) < len(keys) or not new_keys.isdisjoint(self._edge_by_pair):
+            node1_id, node2_id = _first_duplicate(keys, self._edge_by_pair)
+            raise GraphError(f"Edge ({node1_id},{node2_id}) already exists")
+
+    def _extend_edges(self, pairs, attributes):
+        self._thaw()
+        id_to_idx = self._id_to_idx
+        adjacency = self._adjacency
+        in_adjacency = self._in_adjacency
+        start = len(self._edge_src)
+        for node1_id, node2_id in pairs:
+            src = id_to_idx[node1_id]
+            dst = id_to_idx[node2_id]
+            self._edge_src.append(src)
+            self._edge_dst.append(dst)
+            adjacency[src].append(dst)
+            in_adjacency[dst].append(src)
+            if self._undirected:
+                adjacency[dst].append(src)
+                in_adjacency[src].append(dst)
+        self._edge_attrs.extend(attributes)
+        self._edge_order = None
+        self._csr_cache.clear()
+        return range(start, start + len(pairs))
 
     def add_edge(self, node1_id, node2_id, **prop):
-        if node1_id not in self._nodes:
+        node1_id, node2_id = _intern(node1_id), _intern(node2_id)
+        if node1_id not in self._id_to_idx:
             raise GraphError(f"Node {node1_id} not found")
-        if node2_id not in self._nodes:
+        if node2_id not in self._id_to_idx:
             raise GraphError(f"Node {node2_id} not found")
-        
-        for edge in self._edges:
-            n1, n2 = edge.nodes()
-            if n1.identifier() == node1_id and n2.identifier() == node2_id:
-                raise GraphError(f"Edge ({node1_id},{node2_id}) already exists")
+        edge_idx = len(self._edge_src)
+        if self._edge_by_pair.setdefault((node1_id, node2_id), edge_idx) != edge_idx:
+            raise GraphError(f"Edge ({node1_id},{node2_id}) already exists")
+
+        self._extend_edges([(node1_id, node2_id)], [prop])
+
+    def add_edges_batch(self, node1_ids, node2_ids, attributes=None):
+        pairs = list(zip(map(_intern, node1_ids), map(_intern, node2_ids)))
+        attributes = _batch_attributes(attributes, len(pairs), 'edge')
+        self._check_new_edges(pairs, pairs)
+
+        self._edge_by_pair.update(zip(pairs, self._extend_edges(pairs, attributes)))
 
-        node1 = self._nodes[node1_id]
-        node2 = self._nodes[node2_id]
-        new_edge = Edge(node1, node2, **prop)
-        self._edges.append(new_edge)
-        self._adjacency[node1_id].append(node2_id)
+    def _edge_view(self, edge_idx, reverse=False):
+        src, dst = self._edge_src[edge_idx], self._edge_dst[edge_idx]
+        if reverse:
+            src, dst = dst, src
+        return Edge._view(self._node_view(src), self._node_view(dst),
+                          self._edge_attrs[edge_idx])
+
+    def _pair_view(self, node1_id, edge_idx):
+        # undirected pairs looked up against the stored direction get a reversed view
+        return self._edge_view(edge_idx,
+                               self._edge_src[edge_idx] != self._id_to_idx[node1_id])
 
     def edge(self, node1_id, node2_id):
-        for edge in self._edges:
-            n1, n2 = edge.nodes()
-            if n1.identifier() == node1_id and n2.identifier() == node2_id:
-                return edge
-        raise GraphError(f"Edge ({node1_id},{node2_id}) not found")
+        try:
+            edge_idx = self._edge_by_pair[(node1_id, node2_id)]
+        except KeyError:
+            raise GraphError(f"Edge ({node1_id},{node2_id}) not found") from None
+        return self._pair_view(node1_id, edge_idx)
 
     def edges(self):
-        sorted_edges = sorted(self._edges, 
-                            key=lambda e: (e.nodes()[0].identifier(), e.nodes()[1].identifier()))
-        return sorted_edges
+        if self._edge_order is None:
+            # (edge index, reversed) per pair; undirected edges appear both ways
+            id_to_idx = self._id_to_idx
+            edge_src = self._edge_src
+            self._edge_order = [(edge_idx, edge_src[edge_idx] != id_to_idx[node1_id])
+                                for (node1_id, _), edge_idx
+                                in sorted(self._edge_by_pair.items(), key=itemgetter(0))]
+        return [self._edge_view(edge_idx, reverse)
+                for edge_idx, reverse in self._edge_order]
+
+    def _csr(self, adjacency):
+        # rows of a per-node adjacency in compressed sparse row form,
+        # over node indices in id order
+        N = len(self._node_ids)
+        order = self._sorted_node_indices()
+        indptr = array('i', [0])
+        indices = array('i')
+        if order == list(range(N)):
+            # nodes were added in id order: stored indices already are CSR indices
+            for neighbors in adjacency:
+                indices.extend(neighbors)
+                indptr.append(len(indices))
+            return indptr, indices, self._id_to_idx.copy()
+
+        perm = array('i', bytes(4 * N))
+        for idx, node_idx in enumerate(order):
+            perm[node_idx] = idx
+        for node_idx in order:
+            indices.extend(map(perm.__getitem__, adjacency[node_idx]))
+            indptr.append(len(indices))
+        id_to_idx = {self._node_ids[node_idx]: idx for idx, node_idx in enumerate(order)}
+        return indptr, indices, id_to_idx
+
+    def to_csr(self):
+        if 'out' not in self._csr_cache:
+            self._csr_cache['out'] = self._csr(self._adjacency)
+        # copies, so callers cannot corrupt the cached arrays
+        indptr, indices, id_to_idx = self._csr_cache['out']
+        return array('i', indptr), array('i', indices), dict(id_to_idx)
+
+    def _build_csr(self):
+        # in-edge CSR plus out-degrees in the same order, as used by pagerank
+        if 'in' not in self._csr_cache:
+            indptr, in_src, id_to_idx = self._csr(self._in_adjacency)
+            adjacency = self._adjacency
+            out_deg = array('i', [len(adjacency[node_idx])
+                                  for node_idx in self._sorted_node_indices()])
+            self._csr_cache['in'] = (indptr, in_src, out_deg, id_to_idx)
+        return self._csr_cache['in']
 
     def __getitem__(self, key):
         try:
-            return self.node(key)
-        except GraphError:
-            pass
-        
-        try:
-            return self.edge(key[0], key[1])
-        except (GraphError, TypeError, IndexError):
+            return self._node_view(self._id_to_idx[key])
+        except KeyError:
             pass
-        
-        raise GraphError(f"Key {key} not found")
+        edge_idx = self._edge_by_pair.get(key)
+        if edge_idx is None:
+            raise GraphError(f"Key {key} not found")
+        return self._pair_view(key[0], edge_idx)
 
     def __contains__(self, item):
-        if item in self._nodes:
-            return True
-        
-        try:
-            self.edge(item[0], item[1])
-            return True
-        except (GraphError, TypeError, IndexError):
-            return False
+        return item in self._id_to_idx or item in self._edge_by_pair
 
     def __str__(self):
-        result = f'{type(self).__name__}:\n'
-        for node in self.nodes():
-            result += str(node)
-        for edge in self.edges():
-            result += str(edge)
-        return result
+        parts = [f'{type(self).__name__}:\n']
+        parts.extend(map(str, self.nodes()))
+        parts.extend(map(str, self.edges()))
+        return ''.join(parts)
 
 
 class UndirectedGraph(BaseGraph):
+    _undirected = True
 
     def __init__(self):
         super().__init__()
 
     def add_edge(self, node1_id, node2_id, **prop):
+        node1_id, node2_id = _intern(node1_id), _intern(node2_id)
         if node1_id == node2_id:
             raise GraphError(f"Self-loops are not allowed in undirected graphs")
         
-        if node1_id not in self._nodes:
+        if node1_id not in self._id_to_idx:
             raise GraphError(f"Node {node1_id} not found")
-        if node2_id not in self._nodes:
+        if node2_id not in self._id_to_idx:
             raise GraphError(f"Node {node2_id} not found")
-        
-        for edge in self._edges:
-            n1, n2 = edge.nodes()
-            if ((n1.identifier() == node1_id and n2.identifier() == node2_id) or
-                (n1.identifier() == node2_id and n2.identifier() == node1_id)):
-                raise GraphError(f"Edge ({node1_id},{node2_id}) already exists")
-
-        node1 = self._nodes[node1_id]
-        node2 = self._nodes[node2_id]
-        edge1 = Edge(node1, node2, **prop)
-        edge2 = Edge(node2, node1, **prop)
-        self._edges.append(edge1)
-        self._edges.append(edge2)
-        self._adjacency[node1_id].append(node2_id)
-        self._adjacency[node2_id].append(node1_id)
+        # both directions are indexed, so one probe covers (n2, n1) as well
+        edge_idx = len(self._edge_src)
+        if self._edge_by_pair.setdefault((node1_id, node2_id), edge_idx) != edge_idx:
+            raise GraphError(f"Edge ({node1_id},{node2_id}) already exists")
+
+        self._edge_by_pair[(node2_id, node1_id)] = edge_idx
+        self._extend_edges([(node1_id, node2_id)], [prop])
+
+    def add_edges_batch(self, node1_ids, node2_ids, attributes=None):
+        pairs = list(zip(map(_intern, node1_ids), map(_intern, node2_ids)))
+        attributes = _batch_attributes(attributes, len(pairs), 'edge')
+        for node1_id, node2_id in pairs:
+            if node1_id == node2_id:
+                raise GraphError(f"Self-loops are not allowed in undirected graphs")
+        reversed_pairs = [(node2_id, node1_id) for node1_id, node2_id in pairs]
+        self._check_new_edges(pairs, pairs + reversed_pairs)
+
+        edge_indices = self._extend_edges(pairs, attributes)
+        self._edge_by_pair.update(zip(pairs, edge_indices))
+        self._edge_by_pair.update(zip(reversed_pairs, edge_indices))
 
     def degree(self, node_id):
-        if node_id not in self._nodes:
+        if node_id not in self._id_to_idx:
             raise GraphError(f"Node {node_id} not found")
-        return len(self._adjacency[node_id])
-
-    def __contains__(self, item):
-        if item in self._nodes:
-            return True
-        
-        try:
-            self.edge(item[0], item[1])
-            return True
-        except (GraphError, TypeError, IndexError):
-            try:
-                self.edge(item[1], item[0])
-                return True
-            except (GraphError, TypeError, IndexError):
-                return False
+        return len(self._adjacency[self._id_to_idx[node_id]])
 
 
 class DirectedGraph(BaseGraph):
@@ -195,38 +407,60 @@ class DirectedGraph(BaseGraph):
         super().__init__()
 
     def in_degree(self, node_id):
-        if node_id not in self._nodes:
+        if node_id not in self._id_to_idx:
             raise GraphError(f"Node {node_id} not found")
-        
-        in_deg = 0
-        for edge in self._edges:
-            n1, n2 = edge.nodes()
-            if n2.identifier() == node_id:
-                in_deg += 1
-        return in_deg
+        return len(self._in_adjacency[self._id_to_idx[node_id]])
 
     def out_degree(self, node_id):
-        if node_id not in self._nodes:
+        if node_id not in self._id_to_idx:
             raise GraphError(f"Node {node_id} not found")
         
-        return len(self._adjacency[node_id])
-
-
-def read_graph_from_csv(node_file, edge_file, directed=False):
+        return len(self._adjacency[self._id_to_idx[node_id]])
+
+
+# strict literals only: no '1_000', no leading zeros, no 'nan' or 'inf'
+_INT_RE = re.compile(r'[+-]?(?:0|[1-9][0-9]*)')
+_FLOAT_RE = re.compile(r'[+-]?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?')
+_BOOLS = {'True': True, 'False': False}
+
+_COLUMN_TYPES = (
+    (_INT_RE.fullmatch, int),
+    (_FLOAT_RE.fullmatch, float),
+    (_BOOLS.__contains__, _BOOLS.__getitem__),
+)
+
+
+def _column_type(values):
+    for matches, convert in _COLUMN_TYPES:
+        if all(map(matches, values)):
+            return convert
+
+
+def _read_csv_columns(filename, num_ids, infer_types=False):
+    with open(filename, 'r', encoding="utf8") as fo:
+        ro = csv.reader(fo)
+        attr_names = next(ro)[num_ids:]
+        ids = tuple([] for _ in range(num_ids))
+        attributes = []
+        for line in ro:
+            for column, value in zip(ids, line):
+                column.append(value)
+            attributes.append(dict(zip(attr_names, line[num_ids:])))
+    if infer_types:
+        # convert whole columns of int, float or bool literals once, at load
+        for name in attr_names:
+            rows = [row for row in attributes if name in row]
+            convert = _column_type([row[name] for row in rows])
+            if convert is not None:
+                for row in rows:
+                    row[name] = convert(row[name])
+    return ids, attributes
+
+
+def read_graph_from_csv(node_file, edge_file, directed=False, infer_types=False):
     result = DirectedGraph() if directed else UndirectedGraph()
-    for i, filename in enumerate((node_file, edge_file)):
-        attr_start = i + 1
-        with open(filename, 'r', encoding="utf8") as fo:
-            ro = csv.reader(fo)
-            header = next(ro)
-            attr_names = header[attr_start:]
-            for line in ro:
-                identifier, attr_values = (line[:attr_start],
-                                           line[attr_start:])
-                attributes = {attr_names[i]: attr_values[i]
-                              for i in range(len(attr_names))}
-                if i == 0:
-                    result.add_node(*identifier, **attributes)
-                else:
-                    result.add_edge(*identifier, **attributes)
+    (node_ids,), node_attrs = _read_csv_columns(node_file, 1, infer_types)
+    result.add_nodes_batch(node_ids, node_attrs)
+    (node1_ids, node2_ids), edge_attrs = _read_csv_columns(edge_file, 2, infer_types)
+    result.add_edges_batch(node1_ids, node2_ids, edge_attrs)
     return result
@@ -1,3 +1,9 @@
+import copy
+import os
+import pickle
+import tempfile
+from collections import namedtuple
+
 import graph
 
 def undirected_test():
@@ -11,6 +17,32 @@ def undirected_test():
     print(ugraph)
 
 
+def typed_csv_test():
+    ugraph = graph.read_graph_from_csv('data/characters-nodes.csv','data/characters-edges.csv',
+                                       infer_types=True)
+    assert ugraph.node('0').attributes()['Age'] == 20
+    assert ugraph.node('0').attributes()['Name'] == 'Spongebob Squarepants'
+    assert graph.read_graph_from_csv('data/characters-nodes.csv','data/characters-edges.csv')\
+        .node('0').attributes()['Age'] == '20'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        node_file = os.path.join(tmp, 'nodes.csv')
+        edge_file = os.path.join(tmp, 'edges.csv')
+        with open(node_file, 'w', encoding='utf8') as fo:
+            fo.write('Id,Count,Score,Flag,Code,Big,Special\n'
+                     'a,1,1,True,007,1_000,nan\n'
+                     'b,-2,2.5,False,7,1000,inf\n')
+        with open(edge_file, 'w', encoding='utf8') as fo:
+            fo.write('Source,Target,Weight\na,b,0.5\n')
+        typed = graph.read_graph_from_csv(node_file, edge_file, infer_types=True)
+    assert typed.node('a').attributes() == {'Count': 1, 'Score': 1.0, 'Flag': True, 'Code': '007',
+                                           'Big': '1_000', 'Special': 'nan'}
+    assert typed.node('b').attributes() == {'Count': -2, 'Score': 2.5, 'Flag': False, 'Code': '7',
+                                           'Big': '1000', 'Special': 'inf'}
+    assert type(typed.node('a').attributes()['Score']) is float
+    assert typed.edge('a', 'b').attributes()['Weight'] == 0.5
+
+
 def simple_directed_graph():
     dgraph = graph.DirectedGraph()
     dgraph.add_node(0, airport_name='DTW')
@@ -29,9 +61,147 @@ def directed_test():
     dgraph = simple_directed_graph()
     assert dgraph.in_degree(2) == 1
     assert dgraph.out_degree(0) == 2
+    assert dgraph.node(1).attributes()['country'] == 'The Netherlands'
+    assert dgraph.edge(0, 1).attributes()['flight_time_in_hours'] == 8
+    assert dgraph.node(3).attributes_copy() == {}
     print(dgraph)
 
 
+def lookup_test():
+    dgraph = simple_directed_graph()
+    edge = dgraph.edge(0, 1)
+    assert [n.identifier() for n in edge.nodes()] == [0, 1]
+    assert dgraph[1, 0].attributes()['airline_name'] == 'KLM'
+    assert dgraph[2].attributes()['city'] == 'Chicago'
+    for lookup in (lambda: dgraph.edge(1, 2), lambda: dgraph[1, 2], lambda: dgraph[7]):
+        try:
+            lookup()
+            assert False, "missing key should raise GraphError"
+        except graph.GraphError:
+            pass
+    Pair = namedtuple('Pair', 'source target')
+    assert Pair(0, 1) in dgraph
+    assert Pair(1, 2) not in dgraph
+
+    ugraph = graph.read_graph_from_csv('data/characters-nodes.csv','data/characters-edges.csv')
+    assert [n.identifier() for n in ugraph['2', '0'].nodes()] == ['2', '0']
+    assert [n.identifier() for n in ugraph.edge('0', '2').nodes()] == ['0', '2']
+
+
+def batch_test():
+    dgraph = graph.DirectedGraph()
+    dgraph.add_nodes_batch([0, 1, 2, 3, 4],
+                           [{'airport_name': 'DTW'},
+                            {'airport_name': 'AMS', 'country': 'The Netherlands'},
+                            {'airport_name': 'ORD', 'city': 'Chicago'},
+                            {}, {}])
+    dgraph.add_edges_batch([0, 0, 1, 3], [1, 2, 0, 4],
+                           [{'flight_time_in_hours': 8},
+                            {'flight_time_in_hours': 1},
+                            {'airline_name': 'KLM'}, {}])
+    assert str(dgraph) == str(simple_directed_graph())
+    try:
+        dgraph.add_edges_batch([2, 0], [3, 1])
+        assert False, "duplicate edge should be rejected"
+    except graph.GraphError:
+        pass
+    assert (2, 3) not in dgraph
+
+    shared = {'a': 1}
+    dgraph.add_nodes_batch([5, 6], [shared, shared])
+    dgraph.add_edges_batch([5], [6], [shared])
+    shared['a'] = 99
+    assert dgraph[5].attributes() == {'a': 1}
+    assert dgraph[6].attributes() == {'a': 1}
+    assert dgraph[5, 6].attributes() == {'a': 1}
+    for node_ids, attributes in (([7], [[('a', 1)]]), ([7], [{1: 'a'}])):
+        try:
+            dgraph.add_nodes_batch(node_ids, attributes)
+            assert False, "non-dict attributes should be rejected"
+        except graph.GraphError:
+            pass
+    assert 7 not in dgraph
+
+    ugraph = graph.UndirectedGraph()
+    ugraph.add_nodes_batch('abc')
+    ugraph.add_edges_batch('ab', 'bc')
+    assert ugraph.degree('b') == 2
+    assert ('c', 'b') in ugraph
+
+
+def attributes_test():
+    dgraph = graph.DirectedGraph()
+    for i in range(1000):
+        dgraph.add_node(i, **{f'attr{i}': i})
+    assert dgraph[7].attributes() == {'attr7': 7}
+    assert dgraph[999].attributes_copy() == {'attr999': 999}
+    dgraph.add_edge(0, 1, weight=2)
+    dgraph.add_edge(1, 2, label='b')
+    assert dgraph[(1, 2)].attributes() == {'label': 'b'}
+
+    attributes = dgraph[0].attributes()
+    assert attributes.copy() == {'attr0': 0}
+    assert {**attributes, 'extra': 1} == {'attr0': 0, 'extra': 1}
+    assert repr(attributes) == "mappingproxy({'attr0': 0})"
+
+
+def csr_test():
+    dgraph = simple_directed_graph()
+    indptr, indices, id_to_idx = dgraph.to_csr()
+    assert list(indptr) == [0, 2, 3, 3, 4, 4]
+    assert sorted(indices[0:2]) == [1, 2]
+    assert list(indices[2:]) == [0, 4]
+    assert id_to_idx == {0: 0, 1: 1, 2: 2, 3: 3, 4: 4}
+    indptr.append(99)
+    id_to_idx.clear()
+    assert list(dgraph.to_csr()[0]) == [0, 2, 3, 3, 4, 4]
+    assert dgraph.to_csr()[2] == {0: 0, 1: 1, 2: 2, 3: 3, 4: 4}
+    dgraph.add_edge(4, 3)
+    assert list(dgraph.to_csr()[0]) == [0, 2, 3, 3, 4, 5]
+
+    # nodes added out of id order take the index permutation path
+    shuffled = graph.DirectedGraph()
+    for node_id in (2, 0, 1):
+        shuffled.add_node(node_id)
+    in_order = graph.DirectedGraph()
+    for node_id in (0, 1, 2):
+        in_order.add_node(node_id)
+    for g in (shuffled, in_order):
+        g.add_edge(0, 1)
+        g.add_edge(0, 2)
+        g.add_edge(2, 1)
+    indptr, indices, id_to_idx = shuffled.to_csr()
+    assert list(indptr) == [0, 2, 2, 3]
+    assert sorted(indices[0:2]) == [1, 2]
+    assert list(indices[2:]) == [1]
+    assert id_to_idx == {0: 0, 1: 1, 2: 2}
+    assert [list(a) for a in shuffled.to_csr()[:2]] == [list(a) for a in in_order.to_csr()[:2]]
+
+
+def freeze_test():
+    dgraph = simple_directed_graph()
+    dgraph.freeze()
+    assert dgraph.in_degree(0) == 1
+    assert dgraph.out_degree(0) == 2
+    dgraph.add_edge(2, 0)
+    assert dgraph.in_degree(0) == 2
+    dgraph.freeze()
+    assert dgraph.out_degree(2) == 1
+    assert list(dgraph.to_csr()[1]) == [1, 2, 0, 0, 4]
+    for clone in (copy.deepcopy(dgraph), pickle.loads(pickle.dumps(dgraph))):
+        assert str(clone) == str(dgraph)
+        assert clone.out_degree(0) == 2
+        clone.add_edge(3, 0)
+        assert clone.in_degree(0) == 3
+    assert dgraph.in_degree(0) == 2
+
+
 if __name__ == '__main__':
     undirected_test()
+    typed_csv_test()
     directed_test()
+    lookup_test()
+    batch_test()
+    attributes_test()
+    csr_test()
+    freeze_test()
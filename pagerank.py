@@ -1,44 +1,56 @@
 import sys
+from array import array
+from itertools import repeat
+from operator import mul, sub
 import graph
 
-def pagerank(digraph, num_iterations=40, damping_factor=.85):
-    N=len(digraph)
-
-    ranks={node.identifier():1/N for node in digraph.nodes()}
-
-
+def _pagerank_kernel(rows, inv_out_deg, dangling, damping_factor,
+                     num_iterations, tol, ranks):
+    N=len(ranks)
+    teleport=(1-damping_factor)/N
+    # damping folded into the per-node weights, so each row is a plain sum
+    weights=[damping_factor*inv for inv in inv_out_deg]
     for i in range(num_iterations):
-        dangling_sum=0
-        for node in digraph.nodes():
-            if digraph.out_degree(node.identifier()) == 0:
-                dangling_sum += ranks[node.identifier()]
-        new_ranks={}
-        for node in digraph.nodes():
-            node_id=node.identifier()
-            in_links=[edge.nodes()[0].identifier() for edge in digraph.edges()
-                      if edge.nodes()[1].identifier()==node_id]
-            rank_sum=0
-            for in_node_id in in_links:
-                out_degree=digraph.out_degree(in_node_id)
-                if out_degree>0:
-                    rank_sum+=ranks[in_node_id]/out_degree
-            new_ranks[node_id]=(1-damping_factor)/N+damping_factor*(rank_sum+(dangling_sum/N))
+        dangling_sum=sum(map(ranks.__getitem__, dangling))
+        # teleport and dangling terms are the same for every node
+        base=teleport+damping_factor*dangling_sum/N
+        # scale by d/out_degree once per node so each edge is a bare gather
+        contrib=list(map(mul, ranks, weights))
+        get=contrib.__getitem__
+        new_ranks=[base+sum(map(get, in_links)) for in_links in rows]
+        # L1 change summed over all nodes
+        delta=sum(map(abs, map(sub, new_ranks, ranks)))
         ranks=new_ranks
+        if delta<tol*N:
+            break
     return ranks
 
+def pagerank(digraph, num_iterations=40, damping_factor=.85, tol=1e-6):
+    N=len(digraph)
+    if N==0:
+        return {}
+    indptr, in_src, out_deg, id_to_idx = digraph._build_csr()
+    inv_out_deg = array('d', [1/deg if deg else 0.0 for deg in out_deg])
+    dangling = [v for v, deg in enumerate(out_deg) if deg == 0]
+    rows = [in_src[start:end] for start, end in zip(indptr, indptr[1:])]
+
+    ranks=_pagerank_kernel(rows, inv_out_deg, dangling, damping_factor,
+                           num_iterations, tol, [1/N]*N)
+    return {node_id: ranks[idx] for node_id, idx in id_to_idx.items()}
+
 def print_ranks(ranks, max_nodes=20):
     if max_nodes not in range(len(ranks)):
         max_nodes = len(ranks)
 
-    sorted_ids = sorted(ranks.keys(),
-                        key=lambda node: (round(ranks[node], 5), node),
-                        reverse=True)
-    for node_id in sorted_ids[:max_nodes]:
-        print(f'{node_id}: {ranks[node_id]:.5f}')
+    # (rounded rank, id) tuples are built and compared in C, no key callback
+    ranked = sorted(zip(map(round, ranks.values(), repeat(5)), ranks.keys()),
+                    reverse=True)
+    lines = [f'{node_id}: {ranks[node_id]:.5f}' for _, node_id in ranked[:max_nodes]]
     if max_nodes < len(ranks):
-        print('...')
+        lines.append('...')
 
-    print(f'Sum: {(sum(ranks[n] for n in sorted_ids)):.5f}')
+    lines.append(f'Sum: {sum(ranks.values()):.5f}')
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 def pagerank_from_csv(node_file, edge_file, num_iterations):
     rgraph = graph.read_graph_from_csv(node_file, edge_file, True)
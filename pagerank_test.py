@@ -111,6 +111,53 @@ def test_two_node_cycle():
     print("✓ Two-node cycle test passed\n")
 
 
+def test_convergence_tolerance():
+    print("Testing convergence tolerance...")
+    
+    g = graph.DirectedGraph()
+    g.add_node(0)
+    g.add_node(1)
+    g.add_node(2)
+    g.add_edge(0, 1)
+    g.add_edge(0, 2)
+    g.add_edge(1, 0)
+    
+    loose = pagerank.pagerank(g, num_iterations=100, tol=1.0)
+    one_step = pagerank.pagerank(g, num_iterations=1)
+    print(f"Loose tolerance ranks: {loose}")
+    assert loose == one_step, "tol=1.0 should stop after the first iteration"
+    
+    converged = pagerank.pagerank(g, num_iterations=1000)
+    exact = pagerank.pagerank(g, num_iterations=1000, tol=0)
+    for node_id in [0, 1, 2]:
+        assert abs(converged[node_id] - exact[node_id]) < 1e-5, \
+            f"Node {node_id}: got {converged[node_id]:.6f}, expected {exact[node_id]:.6f}"
+    print("✓ Convergence tolerance test passed\n")
+
+
+def test_node_insertion_order():
+    print("Testing node insertion order...")
+    
+    shuffled = graph.DirectedGraph()
+    for node_id in [2, 0, 1]:
+        shuffled.add_node(node_id)
+    in_order = graph.DirectedGraph()
+    for node_id in [0, 1, 2]:
+        in_order.add_node(node_id)
+    for g in [shuffled, in_order]:
+        g.add_edge(0, 1)
+        g.add_edge(0, 2)
+        g.add_edge(2, 1)
+    
+    ranks_shuffled = pagerank.pagerank(shuffled)
+    ranks_in_order = pagerank.pagerank(in_order)
+    print(f"Shuffled insertion ranks: {ranks_shuffled}")
+    for node_id in [0, 1, 2]:
+        assert abs(ranks_shuffled[node_id] - ranks_in_order[node_id]) < 1e-12, \
+            f"Node {node_id}: got {ranks_shuffled[node_id]:.6f}, expected {ranks_in_order[node_id]:.6f}"
+    print("✓ Node insertion order test passed\n")
+
+
 def test_print_ranks():
     print("Testing print_ranks function...")
     
@@ -134,6 +181,8 @@ def run_all_tests():
         test_single_node,
         test_dangling_node,
         test_two_node_cycle,
+        test_convergence_tolerance,
+        test_node_insertion_order,
         test_print_ranks
     ]
     